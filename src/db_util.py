@@ -0,0 +1,221 @@
+"""
+db_util.py — Shared sqlite3 helpers for exercises.py and homework.py
+
+Both files used to carry their own copies of connect / reset_db / print_rows.
+They now import them from here so there is one implementation to maintain.
+"""
+
+from __future__ import annotations
+
+import itertools
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+# Rows pulled per fetchmany() call when streaming a result (see iter_rows).
+FETCH_SIZE = 1024
+# Minimum column width when print_rows streams an iterator it can't pre-scan.
+STREAM_COL_WIDTH = 16
+
+
+class _Connection(sqlite3.Connection):
+    """Connection that keeps one cursor per distinct SQL string (see _exec)."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stmt_cache: dict[str, sqlite3.Cursor] = {}
+
+
+def _exec(
+    conn: sqlite3.Connection, sql: str, params: Iterable = (), as_tuple: bool = False
+) -> sqlite3.Cursor:
+    """
+    Execute sql on a cursor reused per SQL text (saves creating a cursor per
+    call). The compiled statement itself comes from the connection's
+    cached_statements LRU, whichever cursor runs it, so parsing and planning
+    happen once per distinct SQL string.
+    With as_tuple=True rows come back as plain tuples instead of sqlite3.Row.
+    """
+    cache = getattr(conn, "_stmt_cache", None)
+    cur = cache.get(sql) if cache is not None else None
+    if cur is None:
+        cur = conn.cursor()
+        if cache is not None:
+            cache[sql] = cur
+    cur.row_factory = None if as_tuple else conn.row_factory
+    return cur.execute(sql, params)
+
+
+def iter_rows(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Iterable = (),
+    as_tuple: bool = False,
+    size: int = FETCH_SIZE,
+) -> Iterator[Any]:
+    """
+    Stream the rows of sql in fetchmany() batches of size instead of
+    materializing the whole result with fetchall().
+    Uses its own cursor so other queries can run while the generator is
+    paused; the compiled statement still comes from the connection's cache.
+    """
+    cur = conn.cursor()
+    if as_tuple:
+        cur.row_factory = None
+    cur.arraysize = size
+    cur.execute(sql, params)
+    while batch := cur.fetchmany():
+        yield from batch
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Run the block inside one BEGIN IMMEDIATE ... COMMIT (rolling back on error).
+    IMMEDIATE takes the write lock up front instead of upgrading mid-transaction.
+    If the caller already has a transaction open, just join it.
+    """
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    # isolation_level=None: no implicit BEGINs from the driver. Statements
+    # autocommit unless wrapped in an explicit transaction (see _transaction).
+    conn = sqlite3.connect(
+        db_path, isolation_level=None, cached_statements=256, factory=_Connection
+    )
+    conn.row_factory = sqlite3.Row
+    # WAL + synchronous=NORMAL: one fsync per commit and readers don't block
+    # the writer. journal_mode must be switched outside a transaction.
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -65536;")  # 64 MiB
+    conn.execute("PRAGMA mmap_size = 268435456;")  # 256 MiB
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+def analyze(conn: sqlite3.Connection) -> None:
+    """
+    Gather planner statistics (sqlite_stat1) so multi-table joins get a
+    cost-based join order. Call once after seeding.
+    Nothing needs invalidating afterwards: SQLite notices the new stats and
+    re-prepares any cached statement on its next run.
+    """
+    conn.execute("ANALYZE")
+
+
+def close(conn: sqlite3.Connection) -> None:
+    """
+    Close conn, first running PRAGMA optimize: the lightweight form of
+    ANALYZE that only re-analyzes tables whose stats look stale.
+    """
+    try:
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+
+def _is_sqlite_file(path: Path) -> bool:
+    """True if path is empty (SQLite treats that as a new database) or has the SQLite header."""
+    with path.open("rb") as f:
+        header = f.read(16)
+    return not header or header == b"SQLite format 3\x00"
+
+
+def reset_db(db_path: Path) -> None:
+    """
+    Empty the database at db_path by dropping its tables in one transaction,
+    children before parents. The file is kept rather than unlinked so the next
+    connect() reuses it (and the OS page cache) instead of creating it cold;
+    the WAL is then checkpointed and truncated back to zero bytes.
+    A file that isn't a SQLite database is deleted (with any -wal/-shm files).
+    Errors on a real database, e.g. "database is locked", are raised.
+    """
+    if not db_path.exists():
+        return
+    if not _is_sqlite_file(db_path):
+        # A stray non-SQLite file at db_path: start fresh.
+        for path in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+            path.unlink(missing_ok=True)
+        return
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # Tables were created parents first, so newest-first drops children first.
+        tables = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master"
+            " WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid DESC"
+        )]
+        with _transaction(conn):
+            for name in tables:
+                conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def _render(v: Any) -> str:
+    # Floats (percentages) are rounded for display here rather than in SQL.
+    return f"{v:.1f}" if isinstance(v, float) else str(v)
+
+
+def print_rows(
+    title: str,
+    rows: Iterable[Sequence],
+    cols: Optional[Sequence[str]] = None,
+    precompute_widths: bool = True,
+) -> None:
+    """
+    Print rows as a simple table. Columns are read by position, so plain
+    tuples work too; pass cols for the header (defaults to the Row keys).
+    Float values are shown with one decimal place.
+
+    By default all rows are read first so every column fits its widest cell.
+    With precompute_widths=False, rows (e.g. a generator from iter_rows) are
+    printed in a single streaming pass instead, never loaded whole; columns
+    are then at least STREAM_COL_WIDTH wide and longer cells overflow.
+    """
+    print("\n" + "=" * 80)
+    print(title)
+    print("-" * 80)
+    if not precompute_widths:
+        _print_rows_streaming(iter(rows), cols)
+        return
+    rows = list(rows)
+    if not rows:
+        print("(no rows)")
+        return
+    if cols is None:
+        cols = rows[0].keys()
+    # Render every cell once, then size columns from the rendered strings.
+    rendered = [[_render(v) for v in r] for r in rows]
+    widths = [max(len(c), *map(len, col)) for c, col in zip(cols, zip(*rendered))]
+    print(" | ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    print("-+-".join("-" * w for w in widths))
+    print("\n".join(" | ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rendered))
+
+
+def _print_rows_streaming(rows: Iterator[Sequence], cols: Optional[Sequence[str]]) -> None:
+    first = next(rows, None)
+    if first is None:
+        print("(no rows)")
+        return
+    if cols is None:
+        cols = first.keys()
+    # Widths can't depend on cells not read yet; longer cells just overflow.
+    widths = [max(len(c), STREAM_COL_WIDTH) for c in cols]
+    print(" | ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    print("-+-".join("-" * w for w in widths))
+    for r in itertools.chain((first,), rows):
+        print(" | ".join(_render(v).ljust(w) for v, w in zip(r, widths)))
@@ -89,19 +89,19 @@ def create_schema(conn: sqlite3.Connection) -> None:
     DROP TABLE IF EXISTS students;
 
     CREATE TABLE students (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      id INTEGER PRIMARY KEY,
       name TEXT NOT NULL,
       email TEXT NOT NULL UNIQUE
     );
 
     CREATE TABLE assignments (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      id INTEGER PRIMARY KEY,
       title TEXT NOT NULL,
       max_points INTEGER NOT NULL CHECK (max_points > 0)
     );
 
     CREATE TABLE grades (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      id INTEGER PRIMARY KEY,
       student_id INTEGER NOT NULL,
       assignment_id INTEGER NOT NULL,
       score INTEGER NOT NULL CHECK (score >= 0),
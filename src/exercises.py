@@ -17,40 +17,77 @@ from __future__ import annotations
 
 import sqlite3
 from pathlib import Path
-from typing import Optional, Iterable
+from typing import Iterator, Optional
+
+try:
+    from .db_util import (
+        _exec, _transaction, analyze, close, iter_rows, print_rows,
+    )
+    from . import db_util
+except ImportError:  # run as a script: python exercises.py
+    from db_util import (
+        _exec, _transaction, analyze, close, iter_rows, print_rows,
+    )
+    import db_util
 
 DB_PATH = Path("../exercises.db")
 
+_SQL_ADD_STUDENT = "INSERT INTO students (name, email) VALUES (?, ?);"
+_SQL_FIND_STUDENT_BY_EMAIL = "SELECT id, name, email FROM students WHERE email = ?;"
+_SQL_RENAME_STUDENT = "UPDATE students SET name = ? WHERE id = ?;"
+_SQL_DELETE_STUDENT = "DELETE FROM students WHERE id = ?;"
+_SQL_LIST_STUDENTS = "SELECT id, name, email FROM students ORDER BY id;"
+_SQL_ADD_COURSE = "INSERT INTO courses (code, title) VALUES (?, ?);"
+_SQL_COURSE_IDS = "SELECT id, code FROM courses;"
+_SQL_ENROLL_STUDENT = "INSERT INTO enrollments (student_id, course_id) VALUES (?, ?);"
+# ON CONFLICT only skips the duplicate (student_id, course_id) pair; unlike
+# INSERT OR IGNORE it still raises on NOT NULL / FK violations.
+_SQL_ENROLL_STUDENT_ONCE = (
+    "INSERT INTO enrollments (student_id, course_id) VALUES (?, ?)"
+    " ON CONFLICT(student_id, course_id) DO NOTHING RETURNING id;"
+)
+# Drive the join from students so idx_students_name yields rows already in
+# name order; CROSS JOIN pins that order in SQLite's planner. Only the small
+# per-student course_code sort is left (no full temp b-tree sort).
+_SQL_LIST_ENROLLMENTS = """
+    SELECT
+        s.name AS student_name,
+        c.code AS course_code,
+        c.title AS course_title
+    FROM students s
+             CROSS JOIN enrollments e ON e.student_id = s.id
+             JOIN courses  c ON c.id = e.course_id
+    ORDER BY s.name, c.code;
+    """
+_ENROLLMENT_COLS = ("student_name", "course_code", "course_title")
+
 
 def connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return db_util.connect(db_path)
 
 
 def reset_db() -> None:
-    if DB_PATH.exists():
-        DB_PATH.unlink()
+    db_util.reset_db(DB_PATH)
 
 
 def create_schema(conn: sqlite3.Connection) -> None:
+    getattr(conn, "_stmt_cache", {}).clear()
     conn.executescript(
         """
         CREATE TABLE students (
-                                  id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                  id INTEGER PRIMARY KEY,
                                   name TEXT NOT NULL,
                                   email TEXT NOT NULL UNIQUE
         );
 
         CREATE TABLE courses (
-                                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                 id INTEGER PRIMARY KEY,
                                  code TEXT NOT NULL UNIQUE,
                                  title TEXT NOT NULL
         );
 
         CREATE TABLE enrollments (
-                                     id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                     id INTEGER PRIMARY KEY,
                                      student_id INTEGER NOT NULL,
                                      course_id INTEGER NOT NULL,
                                      enrolled_at TEXT NOT NULL DEFAULT (datetime('now')),
@@ -58,6 +95,10 @@ def create_schema(conn: sqlite3.Connection) -> None:
                                      FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
                                      UNIQUE(student_id, course_id)
         );
+
+        -- UNIQUE(student_id, course_id) already serves lookups by student_id.
+        CREATE INDEX idx_enrollments_course ON enrollments(course_id);
+        CREATE INDEX idx_students_name ON students(name);
         """
     )
 
@@ -68,10 +109,7 @@ def add_student(conn: sqlite3.Connection, name: str, email: str) -> int:
     """
     # cursor = conn.execute("INSERT ...", (...))
     # return cursor.lastrowid
-    cursor = conn.execute(
-        "INSERT INTO students (name, email) VALUES (?, ?);",
-        (name, email),
-    )
+    cursor = _exec(conn, _SQL_ADD_STUDENT, (name, email))
     return cursor.lastrowid
 
 
@@ -79,10 +117,7 @@ def find_student_by_email(conn: sqlite3.Connection, email: str) -> Optional[sqli
     """
     Return the student row for the given email, or None.
     """
-    row = conn.execute(
-        "SELECT id, name, email FROM students WHERE email = ?;",
-        (email,),
-    ).fetchone()
+    row = _exec(conn, _SQL_FIND_STUDENT_BY_EMAIL, (email,)).fetchone()
     return row
 
 
@@ -91,10 +126,7 @@ def rename_student(conn: sqlite3.Connection, student_id: int, new_name: str) ->
     Update a student's name. Return number of rows updated (cursor.rowcount).
 
     """
-    cursor = conn.execute(
-        "UPDATE students SET name = ? WHERE id = ?;",
-        (new_name, student_id),
-    )
+    cursor = _exec(conn, _SQL_RENAME_STUDENT, (new_name, student_id))
     return cursor.rowcount
 
 def delete_student(conn: sqlite3.Connection, student_id: int) -> int:
@@ -102,79 +134,72 @@ def delete_student(conn: sqlite3.Connection, student_id: int) -> int:
     Delete a student by id. Return number of rows deleted.
 
     """
-    cursor = conn.execute(
-        "DELETE FROM students WHERE id = ?;",
-        (student_id,),
-    )
+    cursor = _exec(conn, _SQL_DELETE_STUDENT, (student_id,))
     return cursor.rowcount
 
-def list_enrollments(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+def list_enrollments(conn: sqlite3.Connection, as_tuple: bool = False) -> list[sqlite3.Row]:
     """
     Return rows showing: student_name, course_code, course_title
-
+    (plain tuples in that order when as_tuple=True).
     """
-    rows = conn.execute(
-        """
-        SELECT
-            s.name AS student_name,
-            c.code AS course_code,
-            c.title AS course_title
-        FROM enrollments e
-                 JOIN students s ON s.id = e.student_id
-                 JOIN courses  c ON c.id = e.course_id
-        ORDER BY student_name, course_code;
-        """
-    ).fetchall()
+    rows = _exec(conn, _SQL_LIST_ENROLLMENTS, as_tuple=as_tuple).fetchall()
     return rows
 
+def iter_enrollments(conn: sqlite3.Connection, as_tuple: bool = False) -> Iterator[sqlite3.Row]:
+    """
+    Same rows as list_enrollments, streamed in batches instead of loaded
+    all at once (for large enrollment tables).
+    """
+    return iter_rows(conn, _SQL_LIST_ENROLLMENTS, as_tuple=as_tuple)
+
+
 def enroll_student(conn: sqlite3.Connection, student_id: int, course_id: int) -> None:
     """
     Enroll a student in a course.
 
     """
-    conn.execute(
-        "INSERT INTO enrollments (student_id, course_id) VALUES (?, ?);",
-        (student_id, course_id),
-    )
+    _exec(conn, _SQL_ENROLL_STUDENT, (student_id, course_id))
+
+
+def enroll_student_once(conn: sqlite3.Connection, student_id: int, course_id: int) -> Optional[int]:
+    """
+    Enroll a student in a course unless they already are.
+    Returns the new enrollment id, or None if the pair was already enrolled
+    (one statement, no IntegrityError to catch and roll back). Any other
+    constraint violation (NULL or unknown ids) still raises IntegrityError.
+    """
+    row = _exec(conn, _SQL_ENROLL_STUDENT_ONCE, (student_id, course_id)).fetchone()
+    return row[0] if row else None
 
 
-def seed_courses(conn: sqlite3.Connection) -> None:
+def seed_courses(conn: sqlite3.Connection) -> dict[str, int]:
+    """
+    Insert the starter courses and return {course code: id}, read back in
+    one query so callers never have to look a course id up again.
+    """
     courses = [
         ("CS101", "Intro to Programming"),
         ("CS205", "Web Development"),
         ("CS310", "Data Structures"),
     ]
-    conn.executemany("INSERT INTO courses (code, title) VALUES (?, ?);", courses)
-
-
-def print_rows(title: str, rows: Iterable[sqlite3.Row]) -> None:
-    rows = list(rows)
-    print("\n" + "=" * 80)
-    print(title)
-    print("-" * 80)
-    if not rows:
-        print("(no rows)")
-        return
-    cols = rows[0].keys()
-    widths = {c: max(len(c), max(len(str(r[c])) for r in rows)) for c in cols}
-    print(" | ".join(c.ljust(widths[c]) for c in cols))
-    print("-+-".join("-" * widths[c] for c in cols))
-    for r in rows:
-        print(" | ".join(str(r[c]).ljust(widths[c]) for c in cols))
+    conn.executemany(_SQL_ADD_COURSE, courses)
+    return {code: course_id for course_id, code in _exec(conn, _SQL_COURSE_IDS, as_tuple=True)}
 
 
 def main() -> None:
     reset_db()
     conn = connect()
     try:
+        # executescript() commits on its own, so the schema goes first; the seed
+        # data then shares one BEGIN IMMEDIATE ... COMMIT.
         create_schema(conn)
-        seed_courses(conn)
-        conn.commit()
+        with _transaction(conn):
+            course_ids = seed_courses(conn)
 
-        # Expected: you should see ids printed and a dict-like row for the lookup.
-        s1 = add_student(conn, "Etty", "etty@example.com")
-        s2 = add_student(conn, "Rena", "rena@example.com")
-        conn.commit()
+            # Expected: you should see ids printed and a dict-like row for the lookup.
+            s1 = add_student(conn, "Etty", "etty@example.com")
+            s2 = add_student(conn, "Rena", "rena@example.com")
+        analyze(conn)
 
         print(f"Inserted students: Etty={s1}, Rena={s2}")
         row = find_student_by_email(conn, "etty@example.com")
@@ -186,10 +211,10 @@ def main() -> None:
         #   - the second insert raises IntegrityError
         #   - we rollback
         #   - no enrollments are saved for that transaction block
-        course_cs205 = conn.execute("SELECT id FROM courses WHERE code = ?;", ("CS205",)).fetchone()["id"]
+        course_cs205 = course_ids["CS205"]
 
         try:
-            conn.execute("BEGIN;")
+            conn.execute("BEGIN IMMEDIATE;")
             enroll_student(conn, s1, course_cs205)
             enroll_student(conn, s1, course_cs205)  # duplicate on purpose
             conn.execute("COMMIT;")
@@ -199,36 +224,37 @@ def main() -> None:
             conn.execute("ROLLBACK;")
 
 
-        rows = list_enrollments(conn)
-        print_rows("Enrollments (should be empty after rollback)", rows)
+        rows = list_enrollments(conn, as_tuple=True)
+        print_rows("Enrollments (should be empty after rollback)", rows, _ENROLLMENT_COLS)
 
-        # Now do a valid transaction
-        conn.execute("BEGIN;")
-        enroll_student(conn, s1, course_cs205)
+        # Now do a valid transaction. enroll_student_once skips the duplicate
+        # instead of raising, so this one commits.
+        conn.execute("BEGIN IMMEDIATE;")
+        enrollment_id = enroll_student_once(conn, s1, course_cs205)
+        duplicate_id = enroll_student_once(conn, s1, course_cs205)
         conn.execute("COMMIT;")
+        print(f"enroll_student_once -> {enrollment_id}, again -> {duplicate_id}")
 
-        rows = list_enrollments(conn)
-        print_rows("Enrollments after valid commit", rows)
+        rows = iter_enrollments(conn, as_tuple=True)
+        print_rows("Enrollments after valid commit", rows, _ENROLLMENT_COLS, precompute_widths=False)
 
 
         updated = rename_student(conn, s2, "Etty Werczberger")
-        conn.commit()
         print(f"rename_student rowcount={updated}")
 
         # Show updated students
-        students = conn.execute("SELECT id, name, email FROM students ORDER BY id;").fetchall()
+        students = _exec(conn, _SQL_LIST_STUDENTS).fetchall()
         print_rows("Students", students)
 
         deleted = delete_student(conn, s1)
-        conn.commit()
         print(f"delete_student rowcount={deleted}")
 
-        students = conn.execute("SELECT id, name, email FROM students ORDER BY id;").fetchall()
+        students = _exec(conn, _SQL_LIST_STUDENTS).fetchall()
         print_rows("Students after delete", students)
 
         print("\nAll done. If you finished early, add another course and test enrollments.")
     finally:
-        conn.close()
+        close(conn)
 
 
 if __name__ == "__main__":
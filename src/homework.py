@@ -24,22 +24,84 @@ Rules:
 from __future__ import annotations
 
 import sqlite3
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, Iterable
+from typing import Iterator, Optional, Iterable
+
+try:
+    from .db_util import (
+        _exec, _transaction, analyze, close, iter_rows, print_rows,
+    )
+    from . import db_util
+except ImportError:  # run as a script: python homework.py
+    from db_util import (
+        _exec, _transaction, analyze, close, iter_rows, print_rows,
+    )
+    import db_util
 
 DB_PATH = Path("homework_gradebook.db")
 
+_SQL_ADD_STUDENT = "INSERT INTO students (name, email) VALUES (?, ?)"
+_SQL_ADD_ASSIGNMENT = "INSERT INTO assignments (title, max_points) VALUES (?, ?)"
+_SQL_RECORD_GRADE = "INSERT INTO grades (student_id, assignment_id, score) VALUES (?, ?, ?)"
+# Filled with one "?" per email by add_students_bulk, at most
+# _ID_LOOKUP_CHUNK at a time (older SQLite builds allow only 999 variables).
+_ID_LOOKUP_CHUNK = 500
+_SQL_STUDENT_IDS_BY_EMAIL = "SELECT id, email FROM students WHERE email IN ({placeholders})"
+_SQL_LIST_STUDENTS = "SELECT id, name, email FROM students ORDER BY name"
+_SQL_REPORT = """
+    SELECT
+        assignments.title AS assignment_title,
+        grades.score,
+        assignments.max_points,
+        100.0 * grades.score / assignments.max_points AS percent
+    FROM grades
+             JOIN assignments ON grades.assignment_id = assignments.id
+    WHERE grades.student_id = ?
+    """
+# Every student's report in one pass, grouped by student in Python. LEFT JOIN
+# keeps students with no grades (their single row has NULL assignment columns).
+_SQL_ALL_REPORTS = """
+    SELECT
+        students.id AS student_id,
+        students.name AS student_name,
+        assignments.title AS assignment_title,
+        grades.score,
+        assignments.max_points,
+        100.0 * grades.score / assignments.max_points AS percent
+    FROM students
+             LEFT JOIN grades ON grades.student_id = students.id
+             LEFT JOIN assignments ON grades.assignment_id = assignments.id
+    ORDER BY students.name, students.id, grades.id
+    """
+_SQL_LEADERBOARD = """
+    WITH pct AS (
+        SELECT
+            grades.student_id,
+            AVG(100.0 * grades.score / assignments.max_points) AS avg_percent
+        FROM grades
+                 JOIN assignments ON grades.assignment_id = assignments.id
+        GROUP BY grades.student_id
+    )
+    SELECT
+        students.name AS student_name,
+        pct.avg_percent
+    FROM pct
+             JOIN students ON students.id = pct.student_id
+    ORDER BY pct.avg_percent DESC
+    """
+_STUDENT_COLS = ("id", "name", "email")
+_REPORT_COLS = ("assignment_title", "score", "max_points", "percent")
+_LEADERBOARD_COLS = ("student_name", "avg_percent")
+
 
 def connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return db_util.connect(db_path)
 
 
 def reset_db() -> None:
-    if DB_PATH.exists():
-        DB_PATH.unlink()
+    db_util.reset_db(DB_PATH)
 
 
 def create_schema(conn: sqlite3.Connection) -> None:
@@ -63,23 +125,24 @@ def create_schema(conn: sqlite3.Connection) -> None:
       - score (required, >= 0)
       - UNIQUE(student_id, assignment_id) to prevent duplicates
     """
+    getattr(conn, "_stmt_cache", {}).clear()
     conn.execute("""
                  CREATE TABLE students (
-                                           id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                           id INTEGER PRIMARY KEY,
                                            name TEXT NOT NULL,
                                            email TEXT NOT NULL UNIQUE
                  )
                  """)
     conn.execute("""
                  CREATE TABLE assignments (
-                                              id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                              id INTEGER PRIMARY KEY,
                                               title TEXT NOT NULL,
                                               max_points INTEGER NOT NULL CHECK (max_points > 0)
                  )
                  """)
     conn.execute("""
                  CREATE TABLE grades (
-                                         id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                         id INTEGER PRIMARY KEY,
                                          student_id INTEGER NOT NULL,
                                          assignment_id INTEGER NOT NULL,
                                          score INTEGER NOT NULL CHECK (score >= 0),
@@ -88,142 +151,163 @@ def create_schema(conn: sqlite3.Connection) -> None:
                                          UNIQUE(student_id, assignment_id)
                  )
                  """)
+    # UNIQUE(student_id, assignment_id) already serves lookups by student_id.
+    conn.execute("CREATE INDEX idx_grades_assignment ON grades(assignment_id)")
 
 
 def add_student(conn: sqlite3.Connection, name: str, email: str) -> int:
     """Insert into students and return new id."""
-    cur = conn.execute(
-        "INSERT INTO students (name, email) VALUES (?, ?)",
-        (name, email)
-    )
+    cur = _exec(conn, _SQL_ADD_STUDENT, (name, email))
     return cur.lastrowid
 
 
 def add_assignment(conn: sqlite3.Connection, title: str, max_points: int) -> int:
     """Insert into assignments and return new id."""
-    cur = conn.execute(
-        "INSERT INTO assignments (title, max_points) VALUES (?, ?)",
-        (title, max_points)
-    )
+    cur = _exec(conn, _SQL_ADD_ASSIGNMENT, (title, max_points))
     return cur.lastrowid
 
 
 def record_grade(conn: sqlite3.Connection, student_id: int, assignment_id: int, score: int) -> int:
     """Insert into grades and return new id."""
-    cur = conn.execute(
-        "INSERT INTO grades (student_id, assignment_id, score) VALUES (?, ?, ?)",
-        (student_id, assignment_id, score)
-    )
+    cur = _exec(conn, _SQL_RECORD_GRADE, (student_id, assignment_id, score))
     return cur.lastrowid
 
 
-def list_students(conn: sqlite3.Connection) -> list[sqlite3.Row]:
-    """Return all students ordered by name."""
-    cur = conn.execute(
-        "SELECT * FROM students ORDER BY name"
-    )
+def add_students_bulk(conn: sqlite3.Connection, rows: Iterable[tuple[str, str]]) -> dict[str, int]:
+    """
+    Insert many (name, email) students in one transaction.
+    Returns {email: new id}, since executemany does not report lastrowid.
+    """
+    rows = list(rows)
+    if not rows:
+        return {}
+    emails = [email for _, email in rows]
+    ids: dict[str, int] = {}
+    with _transaction(conn):
+        conn.executemany(_SQL_ADD_STUDENT, rows)
+        # Look the ids up in chunks so no query exceeds SQLITE_MAX_VARIABLE_NUMBER.
+        for start in range(0, len(emails), _ID_LOOKUP_CHUNK):
+            chunk = emails[start:start + _ID_LOOKUP_CHUNK]
+            sql = _SQL_STUDENT_IDS_BY_EMAIL.format(placeholders=", ".join("?" * len(chunk)))
+            ids.update((email, student_id) for student_id, email in conn.execute(sql, chunk))
+    return ids
+
+
+def record_grades_bulk(conn: sqlite3.Connection, rows: Iterable[tuple[int, int, int]]) -> int:
+    """
+    Insert many (student_id, assignment_id, score) grades in one transaction.
+    Returns the number of grades inserted.
+    """
+    with _transaction(conn):
+        cur = conn.executemany(_SQL_RECORD_GRADE, rows)
+        return cur.rowcount
+
+
+def list_students(conn: sqlite3.Connection, as_tuple: bool = False) -> list[sqlite3.Row]:
+    """Return all students (id, name, email) ordered by name."""
+    cur = _exec(conn, _SQL_LIST_STUDENTS, as_tuple=as_tuple)
     return cur.fetchall()
 
 
-def student_grade_report(conn: sqlite3.Connection, student_id: int) -> list[sqlite3.Row]:
+def student_grade_report(
+    conn: sqlite3.Connection, student_id: int, as_tuple: bool = False
+) -> list[sqlite3.Row]:
     """
     Return rows for one student with:
       assignment_title, score, max_points, percent
 
     Hint:
-      percent = ROUND(1.0 * score / max_points * 100, 1)
+      percent = 100.0 * score / max_points
+      (left unrounded; print_rows shows floats to one decimal place)
     """
-    cur = conn.execute("""
-                       SELECT
-                           assignments.title AS assignment_title,
-                           grades.score,
-                           assignments.max_points,
-                           ROUND(1.0 * grades.score / assignments.max_points * 100, 1) AS percent
-                       FROM grades
-                                JOIN assignments ON grades.assignment_id = assignments.id
-                       WHERE grades.student_id = ?
-                       """, (student_id,))
+    cur = _exec(conn, _SQL_REPORT, (student_id,), as_tuple=as_tuple)
     return cur.fetchall()
 
 
-def leaderboard(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+def iter_grade_reports(conn: sqlite3.Connection, as_tuple: bool = False) -> Iterator[sqlite3.Row]:
+    """
+    Stream the grade report rows for every student:
+      student_id, student_name, assignment_title, score, max_points, percent
+
+    Rows are ordered by student (name, then id), so they can be split with
+    itertools.groupby without holding the whole class in memory. A student
+    with no grades gets one row whose assignment columns are NULL.
+    Use student_grade_report for one student.
+    """
+    return iter_rows(conn, _SQL_ALL_REPORTS, as_tuple=as_tuple)
+
+
+def all_grade_reports(conn: sqlite3.Connection, as_tuple: bool = False) -> list[sqlite3.Row]:
+    """Same rows as iter_grade_reports, as a list."""
+    return list(iter_grade_reports(conn, as_tuple=as_tuple))
+
+
+def leaderboard(conn: sqlite3.Connection, as_tuple: bool = False) -> list[sqlite3.Row]:
     """
     Return rows:
       student_name, avg_percent
 
+    Pass as_tuple=True (here and in the other read helpers) to get plain
+    tuples in column order instead of sqlite3.Row.
+
     avg_percent should average the per-assignment percent for each student.
     """
-    cur = conn.execute("""
-                       SELECT
-                           students.name AS student_name,
-                           ROUND(AVG(1.0 * grades.score / assignments.max_points * 100), 1) AS avg_percent
-                       FROM grades
-                                JOIN students ON grades.student_id = students.id
-                                JOIN assignments ON grades.assignment_id = assignments.id
-                       GROUP BY students.id
-                       ORDER BY avg_percent DESC
-                       """)
+    cur = _exec(conn, _SQL_LEADERBOARD, as_tuple=as_tuple)
     return cur.fetchall()
 
 
-def print_rows(title: str, rows: Iterable[sqlite3.Row]) -> None:
-    rows = list(rows)
-    print("\n" + "=" * 80)
-    print(title)
-    print("-" * 80)
-    if not rows:
-        print("(no rows)")
-        return
-    cols = rows[0].keys()
-    widths = {c: max(len(c), max(len(str(r[c])) for r in rows)) for c in cols}
-    print(" | ".join(c.ljust(widths[c]) for c in cols))
-    print("-+-".join("-" * widths[c] for c in cols))
-    for r in rows:
-        print(" | ".join(str(r[c]).ljust(widths[c]) for c in cols))
-
-
 def main() -> None:
     reset_db()
     conn = connect()
     try:
-        create_schema(conn)
-        conn.commit()
-
-
-        s_rivka = add_student(conn, "Rivka", "rivka@example.com")
-        s_esther = add_student(conn, "Esther", "esther@example.com")
-        s_leah = add_student(conn, "Leah", "leah@example.com")
+        # Create and seed everything in a single transaction (one fsync instead of one per insert).
+        with _transaction(conn):
+            create_schema(conn)
 
-        a_q1 = add_assignment(conn, "Quiz 1", 10)
-        a_hw1 = add_assignment(conn, "Homework 1", 100)
-        a_mid = add_assignment(conn, "Midterm", 200)
+            ids = add_students_bulk(conn, [
+                ("Rivka", "rivka@example.com"),
+                ("Esther", "esther@example.com"),
+                ("Leah", "leah@example.com"),
+            ])
+            s_rivka = ids["rivka@example.com"]
+            s_esther = ids["esther@example.com"]
+            s_leah = ids["leah@example.com"]
 
-        record_grade(conn, s_rivka, a_q1, 9)
-        record_grade(conn, s_rivka, a_hw1, 95)
+            a_q1 = add_assignment(conn, "Quiz 1", 10)
+            a_hw1 = add_assignment(conn, "Homework 1", 100)
+            a_mid = add_assignment(conn, "Midterm", 200)
 
-        record_grade(conn, s_esther, a_q1, 7)
-        record_grade(conn, s_esther, a_hw1, 88)
+            record_grades_bulk(conn, [
+                (s_rivka, a_q1, 9),
+                (s_rivka, a_hw1, 95),
 
-        record_grade(conn, s_leah, a_q1, 10)
-        record_grade(conn, s_leah, a_hw1, 92)
-        record_grade(conn, s_leah, a_mid, 180)
+                (s_esther, a_q1, 7),
+                (s_esther, a_hw1, 88),
 
-        conn.commit()
+                (s_leah, a_q1, 10),
+                (s_leah, a_hw1, 92),
+                (s_leah, a_mid, 180),
+            ])
+        analyze(conn)
 
 
 
-        print_rows("All students", list_students(conn))
+        students = list_students(conn, as_tuple=True)
+        print_rows("All students", students, _STUDENT_COLS)
 
-        for s in list_students(conn):
-            rows = student_grade_report(conn, s["id"])
-            print_rows(f"Grade report: {s['name']}", rows)
+        # One streamed query for all reports instead of one per student;
+        # only the current student's rows are held in memory.
+        reports = iter_grade_reports(conn, as_tuple=True)
+        for (_, name), rows in groupby(reports, key=itemgetter(0, 1)):
+            rows = [r[2:] for r in rows if r[2] is not None]
+            print_rows(f"Grade report: {name}", rows, _REPORT_COLS)
 
-        print_rows("Leaderboard by average percent", leaderboard(conn))
+        print_rows("Leaderboard by average percent", leaderboard(conn, as_tuple=True), _LEADERBOARD_COLS)
 
 
         print("Homework starter created. Implement TODOs, then uncomment the demo/report blocks in main().")
     finally:
-        conn.close()
+        close(conn)
 
 
 if __name__ == "__main__":
@@ -108,3 +108,138 @@ def test_enrollments_join_and_transaction(tmp_path):
         assert pairs == sorted(pairs)
     finally:
         conn.close()
+
+
+def test_list_enrollments_as_tuple(tmp_path):
+    mod = load_module(tmp_path)
+    conn = setup_db(mod)
+    try:
+        sid = mod.add_student(conn, "Ava", "ava@example.com")
+        cs101 = conn.execute("SELECT id FROM courses WHERE code = ?;", ("CS101",)).fetchone()["id"]
+        mod.enroll_student(conn, sid, cs101)
+        conn.commit()
+
+        assert mod.list_enrollments(conn, as_tuple=True) == [("Ava", "CS101", "Intro to Programming")]
+        # The cached cursor must not leak tuple rows into the default path.
+        assert mod.list_enrollments(conn)[0]["student_name"] == "Ava"
+    finally:
+        conn.close()
+
+
+def test_enroll_student_once_ignores_duplicates(tmp_path):
+    mod = load_module(tmp_path)
+    conn = setup_db(mod)
+    try:
+        sid = mod.add_student(conn, "Ava", "ava@example.com")
+        cs205 = conn.execute("SELECT id FROM courses WHERE code = ?;", ("CS205",)).fetchone()["id"]
+
+        first = mod.enroll_student_once(conn, sid, cs205)
+        second = mod.enroll_student_once(conn, sid, cs205)
+        conn.commit()
+
+        assert isinstance(first, int) and first > 0
+        assert second is None
+        assert len(mod.list_enrollments(conn)) == 1
+
+        # Only the duplicate pair is ignored; other violations still raise.
+        with pytest.raises(sqlite3.IntegrityError):
+            mod.enroll_student_once(conn, None, cs205)
+        with pytest.raises(sqlite3.IntegrityError):
+            mod.enroll_student_once(conn, sid, 9999)
+        assert len(mod.list_enrollments(conn)) == 1
+    finally:
+        conn.close()
+
+
+def test_list_enrollments_avoids_full_sort(tmp_path):
+    mod = load_module(tmp_path)
+    conn = setup_db(mod)
+    try:
+        plan = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + mod._SQL_LIST_ENROLLMENTS)]
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+        assert any("idx_students_name" in step for step in plan)
+    finally:
+        conn.close()
+
+
+def test_iter_enrollments_streams_same_rows(tmp_path):
+    mod = load_module(tmp_path)
+    conn = setup_db(mod)
+    try:
+        sid = mod.add_student(conn, "Ava", "ava@example.com")
+        for code in ("CS310", "CS101"):
+            cid = conn.execute("SELECT id FROM courses WHERE code = ?;", (code,)).fetchone()["id"]
+            mod.enroll_student(conn, sid, cid)
+        conn.commit()
+
+        rows = mod.iter_enrollments(conn, as_tuple=True)
+        assert not isinstance(rows, list)
+        assert list(rows) == mod.list_enrollments(conn, as_tuple=True)
+    finally:
+        conn.close()
+
+
+def test_reset_db_keeps_file_and_drops_tables(tmp_path):
+    mod = load_module(tmp_path)
+    conn = setup_db(mod)
+    mod.add_student(conn, "Ava", "ava@example.com")
+    conn.close()
+
+    mod.reset_db()
+    assert mod.DB_PATH.exists()
+
+    conn = setup_db(mod)  # schema can be recreated from scratch
+    try:
+        assert mod.find_student_by_email(conn, "ava@example.com") is None
+    finally:
+        conn.close()
+
+
+def test_seed_courses_returns_id_map(tmp_path):
+    mod = load_module(tmp_path)
+    conn = mod.connect(mod.DB_PATH)
+    try:
+        mod.create_schema(conn)
+        course_ids = mod.seed_courses(conn)
+        assert set(course_ids) == {"CS101", "CS205", "CS310"}
+        row = conn.execute("SELECT id FROM courses WHERE code = ?;", ("CS205",)).fetchone()
+        assert course_ids["CS205"] == row["id"]
+    finally:
+        conn.close()
+
+
+def test_print_rows_streams_iterators(tmp_path, capsys):
+    mod = load_module(tmp_path)
+
+    def rows():
+        for name in ("Ava", "Maya"):
+            print(f"<fetch {name}>")
+            yield (name, "CS101", "Intro to Programming")
+
+    mod.print_rows("Streamed", rows(), mod._ENROLLMENT_COLS, precompute_widths=False)
+    lines = capsys.readouterr().out.splitlines()
+    # Each row is printed before the next one is pulled from the iterator.
+    assert lines.index("<fetch Maya>") < [i for i, l in enumerate(lines) if l.startswith("Maya")][0]
+    assert lines.index("<fetch Maya>") > [i for i, l in enumerate(lines) if l.startswith("Ava")][0]
+
+    mod.print_rows("Empty", iter([]), mod._ENROLLMENT_COLS, precompute_widths=False)
+    assert "(no rows)" in capsys.readouterr().out
+
+    # Without the opt-in, iterators are measured like lists.
+    mod.print_rows("Fitted", rows(), mod._ENROLLMENT_COLS)
+    lines = capsys.readouterr().out.splitlines()
+    assert any(l.startswith("student_name | course_code | course_title") for l in lines)
+
+
+def test_reset_db_removes_non_database_file(tmp_path):
+    mod = load_module(tmp_path)
+    mod.DB_PATH.write_text("not a sqlite database, just some stray text" * 20)
+    wal = tmp_path / (mod.DB_PATH.name + "-wal")
+    wal.write_text("stale")
+
+    mod.reset_db()
+    assert not mod.DB_PATH.exists()
+    assert not wal.exists()
+
+    conn = setup_db(mod)
+    conn.close()
@@ -71,3 +71,76 @@ def test_schema_and_inserts_and_queries(tmp_path):
         assert avgs == sorted(avgs, reverse=True)
     finally:
         conn.close()
+
+
+def test_bulk_inserts(tmp_path):
+    mod = load_module(tmp_path)
+    conn = mod.connect(mod.DB_PATH)
+    try:
+        mod.create_schema(conn)
+        conn.commit()
+
+        ids = mod.add_students_bulk(conn, [
+            ("Ava", "ava@example.com"),
+            ("Noah", "noah@example.com"),
+        ])
+        assert set(ids) == {"ava@example.com", "noah@example.com"}
+        assert not conn.in_transaction
+
+        a_q1 = mod.add_assignment(conn, "Quiz 1", 10)
+        conn.commit()
+
+        inserted = mod.record_grades_bulk(conn, [
+            (ids["ava@example.com"], a_q1, 9),
+            (ids["noah@example.com"], a_q1, 7),
+        ])
+        assert inserted == 2
+
+        ava_report = mod.student_grade_report(conn, ids["ava@example.com"])
+        assert [r["score"] for r in ava_report] == [9]
+    finally:
+        conn.close()
+
+
+def test_all_grade_reports(tmp_path):
+    mod = load_module(tmp_path)
+    conn = mod.connect(mod.DB_PATH)
+    try:
+        mod.create_schema(conn)
+        s_ava = mod.add_student(conn, "Ava", "ava@example.com")
+        s_noah = mod.add_student(conn, "Noah", "noah@example.com")
+        mod.add_student(conn, "Maya", "maya@example.com")  # no grades
+        a_q1 = mod.add_assignment(conn, "Quiz 1", 10)
+        a_hw1 = mod.add_assignment(conn, "Homework 1", 100)
+        mod.record_grade(conn, s_ava, a_q1, 9)
+        mod.record_grade(conn, s_ava, a_hw1, 95)
+        mod.record_grade(conn, s_noah, a_q1, 7)
+        conn.commit()
+
+        rows = mod.all_grade_reports(conn)
+        assert [r["student_name"] for r in rows] == ["Ava", "Ava", "Maya", "Noah"]
+
+        # Each student's slice matches the single-student report.
+        ava = [tuple(r)[2:] for r in rows if r["student_id"] == s_ava]
+        assert ava == [tuple(r) for r in mod.student_grade_report(conn, s_ava)]
+
+        maya = [r for r in rows if r["student_name"] == "Maya"]
+        assert len(maya) == 1 and maya[0]["assignment_title"] is None
+    finally:
+        conn.close()
+
+
+def test_add_students_bulk_large_batch(tmp_path):
+    mod = load_module(tmp_path)
+    conn = mod.connect(mod.DB_PATH)
+    try:
+        mod.create_schema(conn)
+        rows = [(f"Student {i}", f"s{i}@example.com") for i in range(40000)]
+
+        ids = mod.add_students_bulk(conn, rows)
+        assert len(ids) == len(rows)
+        assert len(set(ids.values())) == len(rows)
+        row = mod.list_students(conn)[0]
+        assert ids[row["email"]] == row["id"]
+    finally:
+        conn.close()